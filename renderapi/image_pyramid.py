@@ -31,15 +31,12 @@ class MipMap:
         dict
             json compatible dictionary representaton
         """
-        return dict(self.__iter__())
+        return self._formatUrls()
 
     def _formatUrls(self):
-        d = {}
-        if self.imageUrl is not None:
-            d.update({'imageUrl': self.imageUrl})
-        if self.maskUrl is not None:
-            d.update({'maskUrl': self.maskUrl})
-        return d
+        return {k: v for k, v in (('imageUrl', self.imageUrl),
+                                  ('maskUrl', self.maskUrl))
+                if v is not None}
 
     def __setitem__(self, key, value):
         if key == 'imageUrl':
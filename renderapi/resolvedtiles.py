@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 from .tilespec import TileSpec
 from .transform import load_transform_json
-from .utils import NullHandler, put_json, jbool, get_json
+from .utils import (NullHandler, put_json, jbool, get_json,
+                    renderdumps_bytes)
 from .render import format_preamble, renderaccess
 from .errors import RenderError
 import logging
@@ -34,11 +35,21 @@ class ResolvedTiles:
         }
         return d
 
+    def to_json_bytes(self):
+        """serialize to json in a single dumps call,
+        using orjson if it is installed
+
+        Returns
+        -------
+        bytes
+            utf-8 encoded json representation of this object
+        """
+        return renderdumps_bytes(self.to_dict())
+
     def from_dict(self, d):
-        self.tilespecs = []
+        self.tilespecs = [TileSpec(json=ts)
+                          for ts in d['tileIdToSpecMap'].values()]
         self.transforms = []
-        for ts in d['tileIdToSpecMap'].values():
-            self.tilespecs.append(TileSpec(json=ts))
         for transformId, tform_json in d['transformIdToSpecMap'].items():
             tform_json['transformId'] = transformId
             self.transforms.append(load_transform_json(tform_json))
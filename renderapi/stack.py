@@ -91,7 +91,7 @@ class StackVersion:
         d : dict
             dictionary to update the properties of this object
         """
-        self.__dict__.update({k: v for k, v in d.items()})
+        self.__dict__.update(d)
 
 
 @renderaccess
@@ -67,8 +67,8 @@ class TileSpec:
 
     def __init__(self, tileId=None, z=None, width=None, height=None,
                  imageUrl=None, maskUrl=None,
-                 minint=0, maxint=65535, layout=None, tforms=[],
-                 inputfilters=[], json=None, channels=None,
+                 minint=0, maxint=65535, layout=None, tforms=None,
+                 inputfilters=None, json=None, channels=None,
                  mipMapLevels=None, imagePyramid=None, **kwargs):
         if json is not None:
             self.from_dict(json)
@@ -80,8 +80,8 @@ class TileSpec:
             self.layout = layout
             self.minint = minint
             self.maxint = maxint
-            self.tforms = tforms
-            self.inputfilters = inputfilters
+            self.tforms = [] if tforms is None else tforms
+            self.inputfilters = [] if inputfilters is None else inputfilters
             self.layout = Layout(**kwargs) if layout is None else layout
 
             if imagePyramid is not None:
@@ -161,32 +161,21 @@ class TileSpec:
         dict
             json compatible dictionary representation of this object
         """
-        thedict = {}
-        thedict['tileId'] = self.tileId
-        thedict['z'] = self.z
-        thedict['width'] = self.width
-        thedict['height'] = self.height
-        thedict['minIntensity'] = self.minint
-        thedict['maxIntensity'] = self.maxint
-        if self.layout is not None:
-            thedict['layout'] = self.layout.to_dict()
-        thedict['mipmapLevels'] = self.ip.to_dict()
-        thedict['transforms'] = {}
-        thedict['transforms']['type'] = 'list'
-        # thedict['transforms']['specList']=[t.to_dict() for t in self.tforms]
-        thedict['transforms']['specList'] = []
-        if self.channels is not None:
-            thedict['channels'] = [ch.to_dict() for ch in self.channels]
-        for t in self.tforms:
-            strlist = {}
-            # added by sharmi - if your speclist contains a speclist (can
-            # happen if you run the optimization more than once)
-            if isinstance(t, list):
-                strlist['type'] = 'list'
-                strlist['specList'] = [tt.to_dict() for tt in t]
-                thedict['transforms']['specList'].append(strlist)
-            else:
-                thedict['transforms']['specList'].append(t.to_dict())
+        thedict = {
+            'tileId': self.tileId,
+            'z': self.z,
+            'width': self.width,
+            'height': self.height,
+            'minIntensity': self.minint,
+            'maxIntensity': self.maxint,
+            'layout': (None if self.layout is None
+                       else self.layout.to_dict()),
+            'mipmapLevels': self.ip.to_dict(),
+            'transforms': {
+                'type': 'list',
+                'specList': [self._tform_to_dict(t) for t in self.tforms]},
+            'channels': (None if self.channels is None
+                         else [ch.to_dict() for ch in self.channels])}
 
         # TODO filters not implemented
         '''
@@ -200,6 +189,14 @@ class TileSpec:
         thedict = {k: v for k, v in thedict.items() if v is not None}
         return thedict
 
+    @staticmethod
+    def _tform_to_dict(t):
+        # added by sharmi - if your speclist contains a speclist (can
+        # happen if you run the optimization more than once)
+        if isinstance(t, list):
+            return {'type': 'list', 'specList': [tt.to_dict() for tt in t]}
+        return t.to_dict()
+
     def from_dict(self, d):
         """Method to load tilespec from json dictionary
 
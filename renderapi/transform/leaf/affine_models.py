@@ -43,7 +43,9 @@ class AffineModel(Transform):
         list of labels to give this transform
     M : numpy.array
         3x3 numpy array representing 2d Affine with homogeneous coordinates
-        populates with values from M00, M01, M10, M11, B0, B1 with load_M()
+        populates with values from M00, M01, M10, M11, B0, B1 with load_M().
+        M is read-only because values derived from it are cached;
+        assign a new array to change it.
 
     """
 
@@ -93,10 +95,13 @@ class AffineModel(Transform):
 
     @property
     def dataString(self):
-        """dataString string for this transform"""
-        return "%.10f %.10f %.10f %.10f %.10f %.10f" % (
-            self.M[0, 0], self.M[1, 0], self.M[0, 1],
-            self.M[1, 1], self.M[0, 2], self.M[1, 2])
+        """dataString string for this transform, cached until M is
+        next assigned, copied or unpickled"""
+        if self._dataString is None:
+            self._dataString = "%.10f %.10f %.10f %.10f %.10f %.10f" % (
+                self.M[0, 0], self.M[1, 0], self.M[0, 1],
+                self.M[1, 1], self.M[0, 2], self.M[1, 2])
+        return self._dataString
 
     def _process_dataString(self, datastring):
         """generate datastring and param attributes from datastring"""
@@ -110,14 +115,65 @@ class AffineModel(Transform):
         self.load_M()
 
     def load_M(self):
-        """method to take the attribute of self and fill in self.M"""
-        self.M = np.identity(3, np.double)
-        self.M[0, 0] = self.M00
-        self.M[0, 1] = self.M01
-        self.M[1, 0] = self.M10
-        self.M[1, 1] = self.M11
-        self.M[0, 2] = self.B0
-        self.M[1, 2] = self.B1
+        """method to take the attribute of self and fill in self.M.
+        Call this after changing M00...B1.  This rebuilds M from those
+        attributes, replacing any M assigned directly.  M is read-only;
+        to change the matrix itself, assign a new array to M."""
+        M = np.identity(3, np.double)
+        M[0, 0] = self.M00
+        M[0, 1] = self.M01
+        M[1, 0] = self.M10
+        M[1, 1] = self.M11
+        M[0, 2] = self.B0
+        M[1, 2] = self.B1
+        M.flags.writeable = False
+        self.M = M
+
+    @property
+    def M(self):
+        """read-only 3x3 numpy array representing 2d Affine with
+        homogeneous coordinates.  Assigning to M clears values cached
+        from it."""
+        return self._M
+
+    @M.setter
+    def M(self, M):
+        M = np.asarray(M, dtype=np.double)
+        if M.flags.writeable:
+            # freeze a copy so the caller's array stays writable
+            M = M.copy()
+            M.flags.writeable = False
+        self._M = M
+        self._Minv = None
+        self._dataString = None
+
+    @property
+    def Minv(self):
+        """cached, read-only 3x3 inverse of M, computed in closed form"""
+        if self._Minv is None:
+            (a, b, tx), (c, d, ty) = self.M[0], self.M[1]
+            det = a * d - b * c
+            if det == 0:
+                raise LinAlgError('Singular matrix')
+            Minv = np.identity(3, np.double)
+            Minv[0, 0] = d / det
+            Minv[0, 1] = -b / det
+            Minv[1, 0] = -c / det
+            Minv[1, 1] = a / det
+            Minv[0, 2] = (b * ty - d * tx) / det
+            Minv[1, 2] = (c * tx - a * ty) / det
+            Minv.flags.writeable = False
+            self._Minv = Minv
+        return self._Minv
+
+    def __setstate__(self, state):
+        # pickle and deepcopy restore M as a writable array; route it
+        # through the setter to freeze it and drop stale cached values
+        state = dict(state)
+        M = state.pop('_M', None)
+        self.__dict__.update(state)
+        if M is not None:
+            self.M = M
 
     @staticmethod
     def fit(A, B, return_all=False):
@@ -225,7 +281,7 @@ class AffineModel(Transform):
         AffineModel
             an inverted version of this transformation
         """
-        inv_M = np.linalg.inv(self.M)
+        inv_M = self.Minv
         Ai = AffineModel(inv_M[0, 0], inv_M[0, 1], inv_M[1, 0],
                          inv_M[1, 1], inv_M[0, 2], inv_M[1, 2])
         return Ai
@@ -269,42 +325,57 @@ class AffineModel(Transform):
         -------
         numpy.array: a Nx2 array of x,y points
         """
-        points = points[:, 0:Nd] / np.tile(points[:, 2], (Nd, 1)).T
-        return points
+        return points[:, 0:Nd] / points[:, 2:3]
+
+    @staticmethod
+    def _apply_M(M, points, xp=np):
+        """apply the affine part of homogeneous matrix M to Nx2 points
+        without padding to homogeneous coordinates.
+        float32 points are transformed and returned as float32"""
+        if points.shape[1] != 2:
+            raise ConversionError('Points must be of shape (:, 2) '
+                                  '-- got {}'.format(points.shape))
+        points = xp.asarray(points)
+        if points.dtype == np.float32:
+            M = M.astype(np.float32)
+        M = xp.asarray(M)
+        return points.dot(M[:2, :2].T) + M[:2, 2]
 
-    def tform(self, points):
+    def tform(self, points, xp=np):
         """transform a set of points through this transformation
 
         Parameters
         ----------
         points : numpy.array
             a Nx2 array of x,y points
+        xp : module
+            array module to compute with, e.g. cupy to run on the GPU
 
         Returns
         -------
         numpy.array
             a Nx2 array of x,y points after transformation
+            (an xp array if xp is not numpy)
         """
-        points, Nd = self.convert_to_point_vector(points)
-        pt = np.dot(self.M, points.T).T
-        return self.convert_points_vector_to_array(pt, Nd)
+        return self._apply_M(self.M, points, xp=xp)
 
-    def inverse_tform(self, points):
+    def inverse_tform(self, points, xp=np):
         """transform a set of points through the inverse of this transformation
 
         Parameters
         ----------
         points : numpy.array
             a Nx2 array of x,y points
+        xp : module
+            array module to compute with, e.g. cupy to run on the GPU
 
         Returns
         -------
         numpy.array
             a Nx2 array of x,y points after inverse transformation
+            (an xp array if xp is not numpy)
         """
-        points, Nd = self.convert_to_point_vector(points)
-        pt = np.dot(np.linalg.inv(self.M), points.T).T
-        return self.convert_points_vector_to_array(pt, Nd)
+        return self._apply_M(self.Minv, points, xp=xp)
 
     def calc_properties(self):
         return calc_first_order_properties(
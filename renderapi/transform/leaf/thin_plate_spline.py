@@ -11,6 +11,41 @@ __all__ = ['ThinPlateSplineTransform']
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.StreamHandler(sys.stdout))
 
+# the fused numba kernel beats cdist once N * nLm reaches about this much
+# work; smaller calls stay on numpy.  The compiled kernel is cached on disk
+# (numba falls back to a user cache directory if the package is read-only),
+# so only the first call on a machine pays the JIT compile
+NUMBA_MIN_WORK = 10000000
+
+try:
+    from numba import njit, prange
+except ImportError as e:
+    logger.debug(e)
+    logger.debug('numba not available, using numpy for '
+                 'ThinPlateSplineTransform deformation')
+    _deformation_contribution_numba = None
+else:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _deformation_contribution_numba(pts, srcPts, dMtxDat):
+        N, ndims = pts.shape
+        nLm = srcPts.shape[0]
+        out = np.zeros((N, ndims))
+        for i in prange(N):
+            result = np.zeros(ndims)
+            for lnd in range(nLm):
+                r2 = 0.0
+                for d in range(ndims):
+                    delta = srcPts[lnd, d] - pts[i, d]
+                    r2 += delta * delta
+                if r2 > 1e-16:
+                    # r^2 log(r) == 0.5 r^2 log(r^2)
+                    nrm = 0.5 * r2 * np.log(r2)
+                    for d in range(ndims):
+                        result[d] += nrm * dMtxDat[lnd, d]
+            for d in range(ndims):
+                out[i, d] = result[d]
+        return out
+
 
 class ThinPlateSplineTransform(Transform):
     """
@@ -66,49 +101,125 @@ class ThinPlateSplineTransform(Transform):
 
         try:
             values = decodeBase64(fields[4])
+            # landmarks and coefficients are both held as C-contiguous
+            # nLm x ndims; values is contiguous so srcPts is a view
             self.srcPts = values[0:self.ndims*self.nLm].reshape(
-                                           self.ndims, self.nLm, order='F')
-            self.dMtxDat = values[self.ndims*self.nLm:].reshape(
-                                           self.ndims, self.nLm, order='C')
+                                           self.nLm, self.ndims)
+            self.dMtxDat = np.ascontiguousarray(
+                    values[self.ndims*self.nLm:].reshape(
+                                           self.ndims, self.nLm).T)
         except ValueError:
             raise RenderError(
                 "inconsistent sizes and array lengths, \
                  in ThinPlateSplineTransform dataString")
 
-    def tform(self, points):
+    def tform(self, points, xp=np):
         """transform a set of points through this transformation
 
         Parameters
         ----------
         points : numpy.array
             a Nx2 array of x,y points
+        xp : module
+            array module to compute with, e.g. cupy to run on the
+            GPU.  Landmarks and coefficients are copied to the
+            device once and reused.
 
         Returns
         -------
         numpy.array
             a Nx2 array of x,y points after transformation
+            (an xp array if xp is not numpy)
         """
-        return self.apply(points)
+        return self.apply(points, xp=xp)
 
-    def apply(self, points):
+    def apply(self, points, xp=np):
         if not hasattr(self, 'dMtxDat'):
-            return points
-
-        result = points + self.computeDeformationContribution(points)
-        if self.aMtx is not None:
-            result += self.aMtx.dot(points.transpose()).transpose()
-        if self.bVec is not None:
-            result += self.bVec
+            return xp.asarray(points)
+
+        points = xp.asarray(points)
+        _, _, aMtx, bVec = self._device_arrays(xp)
+        # the deformation is a fresh N x ndims array; accumulate into it
+        result = self.computeDeformationContribution(points, xp=xp)
+        result += points
+        if aMtx is not None:
+            result += aMtx.dot(points.transpose()).transpose()
+        if bVec is not None:
+            result += bVec
 
         return result
 
-    def computeDeformationContribution(self, points):
-        disp = scipy.spatial.distance.cdist(
-                points,
-                self.srcPts.transpose(),
-                metric='sqeuclidean')
-        disp *= np.ma.log(np.sqrt(disp)).filled(0.0)
-        return disp.dot(self.dMtxDat.transpose())
+    def _device_arrays(self, xp):
+        """srcPts, dMtxDat, aMtx and bVec as xp arrays, cached until
+        any of the host arrays is replaced"""
+        host = (self.srcPts, self.dMtxDat, self.aMtx, self.bVec)
+        if xp is np:
+            return host
+        cache = getattr(self, '_device_cache', None)
+        stale = cache is None or cache[0] is not xp
+        if not stale:
+            stale = any(a is not b for a, b in zip(cache[1], host))
+        if stale:
+            device = tuple(None if a is None else xp.asarray(a)
+                           for a in host)
+            cache = (xp, host, device)
+            self._device_cache = cache
+        return cache[2]
+
+    def computeDeformationContribution(self, points, xp=np):
+        points = xp.asarray(points)
+        use_numba = xp is np and _deformation_contribution_numba is not None
+        if use_numba and points.shape[0] * self.nLm >= NUMBA_MIN_WORK:
+            return _deformation_contribution_numba(
+                    np.ascontiguousarray(points, dtype=np.float64),
+                    self.srcPts, self.dMtxDat)
+        if xp is np:
+            r2 = scipy.spatial.distance.cdist(
+                    points, self.srcPts, metric='sqeuclidean')
+            return self._r2logr(r2).dot(self.dMtxDat)
+        srcPts, dMtxDat, _, _ = self._device_arrays(xp)
+        # |p - s|^2 = |p|^2 + |s|^2 - 2 p.s keeps the temporaries N x nLm,
+        # but it cancels for nearby pairs far from the origin: the error in
+        # r^2 grows with |p|^2 (about 5e-6 px^2 in float64 and 2e3 px^2 in
+        # float32 at 1e5 px coordinates), where cdist on the numpy path
+        # stays exact
+        r2 = (points * points).sum(axis=1)[:, np.newaxis]
+        r2 = r2 + (srcPts * srcPts).sum(axis=1)[np.newaxis, :]
+        r2 -= 2.0 * points.dot(srcPts.T)
+        xp.maximum(r2, 0.0, out=r2)
+        return self._r2logr(r2, xp=xp).dot(dMtxDat)
+
+    @staticmethod
+    def _r2logr(r2, xp=np):
+        # branchless r^2 log(r) == 0.5 r^2 log(r^2), zero at the landmarks
+        mask = r2 > 1e-16
+        nrm = 0.5 * r2 * xp.log(xp.where(mask, r2, 1.0))
+        nrm *= mask
+        return nrm
+
+    @classmethod
+    def tform_batch(cls, transforms, points):
+        """transform one set of points through each of several
+        ThinPlateSplineTransforms into a single preallocated array
+
+        Parameters
+        ----------
+        transforms : list of :class:`ThinPlateSplineTransform`
+            transforms to apply
+        points : numpy.array
+            a Nx2 array of x,y points
+
+        Returns
+        -------
+        numpy.array
+            a BxNx2 array of x,y points, where result[i] is
+            points transformed by transforms[i]
+        """
+        points = np.asarray(points)
+        result = np.empty((len(transforms),) + points.shape)
+        for i, t in enumerate(transforms):
+            result[i] = t.apply(points)
+        return result
 
     def gradient_descent(
             self,
@@ -190,7 +301,7 @@ class ThinPlateSplineTransform(Transform):
         Returns
         -------
         dMatrix : numpy.array
-            ndims x nLm
+            nLm x ndims
         aMatrix : numpy.array
             ndims x ndims, affine matrix
         bVector : numpy.array
@@ -208,16 +319,13 @@ class ThinPlateSplineTransform(Transform):
         y = (B - A).flatten()
 
         # compute K
-        # tempting to matricize this, but, nLm x nLm can get big
-        # settle for vectorize
+        # the nLm x nLm kernel is a quarter the size of K itself,
+        # so fill both dimension blocks from one distance matrix
         kMatrix = np.zeros((ndims * nLm, ndims * nLm))
-        for i in range(nLm):
-            r = np.linalg.norm(A[i, :] - A, axis=1)
-            nrm = np.zeros_like(r)
-            ind = np.argwhere(r > 1e-8)
-            nrm[ind] = r[ind] * r[ind] * np.log(r[ind])
-            kMatrix[i * ndims, 0::2] = nrm
-            kMatrix[(i * ndims + 1)::2, 1::2] = nrm
+        nrm = ThinPlateSplineTransform._r2logr(
+                scipy.spatial.distance.cdist(A, A, metric='sqeuclidean'))
+        for d in range(ndims):
+            kMatrix[d::ndims, d::ndims] = nrm
 
         # compute L
         lMatrix = kMatrix
@@ -241,7 +349,7 @@ class ThinPlateSplineTransform(Transform):
 
         wMatrix = np.linalg.solve(lMatrix, y)
 
-        dMatrix = np.reshape(wMatrix[0: ndims * nLm], (ndims, nLm), order='F')
+        dMatrix = np.reshape(wMatrix[0: ndims * nLm], (nLm, ndims))
         aMatrix = None
         bVector = None
         if computeAffine:
@@ -269,7 +377,7 @@ class ThinPlateSplineTransform(Transform):
         self.dMtxDat, self.aMtx, self.bVec = self.fit(
                 A, B, computeAffine=computeAffine)
         (self.nLm, self.ndims) = B.shape
-        self.srcPts = np.transpose(A)
+        self.srcPts = np.array(A, dtype=np.float64)
 
     @property
     def dataString(self):
@@ -282,8 +390,8 @@ class ThinPlateSplineTransform(Transform):
             b64_1 = "null"
 
         blk2 = np.concatenate((
-            self.srcPts.flatten(order='F'),
-            self.dMtxDat.flatten(order='C')))
+            self.srcPts.flatten(),
+            self.dMtxDat.T.flatten()))
         b64_2 = encodeBase64(blk2)
 
         return '{} {} {}'.format(header, b64_1, b64_2)
@@ -392,11 +500,11 @@ class ThinPlateSplineTransform(Transform):
         ThinPlateSplineTransform
         """
 
-        mn = self.srcPts.min(axis=1)
-        mx = self.srcPts.max(axis=1)
+        mn = self.srcPts.min(axis=0)
+        mx = self.srcPts.max(axis=0)
         new_src = self.src_array(
                 mn[0], mn[1], mx[0], mx[1], starting_grid, starting_grid)
-        old_src = self.srcPts.transpose()
+        old_src = self.srcPts
         old_dst = self.tform(old_src)
 
         return ThinPlateSplineTransform.mesh_refine(
@@ -469,18 +577,18 @@ class ThinPlateSplineTransform(Transform):
         if self.aMtx is None:
             computeAffine = False
 
-        mn = self.srcPts.min(axis=1)
-        mx = self.srcPts.max(axis=1)
+        mn = self.srcPts.min(axis=0)
+        mx = self.srcPts.max(axis=0)
         src = self.src_array(mn[0], mn[1], mx[0], mx[1], ngrid, ngrid)
 
         if preserve_srcPts:
             # do not repeat close points
             dist = scipy.spatial.distance.cdist(
                     src,
-                    self.srcPts.transpose(),
+                    self.srcPts,
                     metric='euclidean')
             ind = np.invert(np.any(dist < 1e-3, axis=0))
-            src = np.vstack((src, self.srcPts.transpose()[ind]))
+            src = np.vstack((src, self.srcPts[ind]))
 
         new_tform.estimate(
                 src * factor,
@@ -14,6 +14,18 @@ from .thin_plate_spline import (
         ThinPlateSplineTransform)
 __all__ = ['load_leaf_json']
 
+_LEAF_TRANSFORM_DISPATCH = {
+    tform_class.className: tform_class for tform_class in (
+        AffineModel,
+        Polynomial2DTransform,
+        TranslationModel,
+        RigidModel,
+        SimilarityModel,
+        NonLinearTransform,
+        LensCorrection,
+        ThinPlateSplineTransform,
+        NonLinearCoordinateTransform)}
+
 
 def load_leaf_json(d):
     """function to get the proper deserialization function for leaf transforms
@@ -34,27 +46,13 @@ def load_leaf_json(d):
         if d['type'] != leaf or is omitted
 
     """
-    handle_load_leaf = {
-        AffineModel.className: lambda x: AffineModel(json=x),
-        Polynomial2DTransform.className:
-            lambda x: Polynomial2DTransform(json=x),
-        TranslationModel.className: lambda x: TranslationModel(json=x),
-        RigidModel.className: lambda x: RigidModel(json=x),
-        SimilarityModel.className: lambda x: SimilarityModel(json=x),
-        NonLinearTransform.className: lambda x: NonLinearTransform(json=x),
-        LensCorrection.className: lambda x: LensCorrection(json=x),
-        ThinPlateSplineTransform.className:
-            lambda x: ThinPlateSplineTransform(json=x),
-        NonLinearCoordinateTransform.className:
-            lambda x: NonLinearCoordinateTransform(json=x)}
-
     tform_type = d.get('type', 'leaf')
     if tform_type != 'leaf':
         raise RenderError(
             'Unexpected or unknown Transform Type {}'.format(tform_type))
     tform_class = d['className']
     try:
-        return handle_load_leaf[tform_class](d)
+        return _LEAF_TRANSFORM_DISPATCH[tform_class](json=d)
     except KeyError as e:
         logger.info('Leaf transform class {} not defined in '
                     'transform module, using generic'.format(e))
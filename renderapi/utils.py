@@ -25,6 +25,12 @@ except ImportError:
     import json as requests_json
 requests.models.complexjson = requests_json
 
+# use orjson if installed for faster serialization of large payloads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class NullHandler(logging.Handler):
     """handler to avoid logging errors for, e.g., missing logger setup"""
@@ -238,6 +244,27 @@ def renderdumps(obj, *args, **kwargs):
     return json.dumps(obj, *args, cls=cls_, **kwargs)
 
 
+def renderdumps_bytes(obj):
+    """serialize to utf-8 encoded json bytes, using orjson if installed
+    and falling back to :func:`renderdumps`
+
+    Parameters
+    ----------
+    obj : obj
+        object to serialize
+
+    Returns
+    -------
+    bytes
+        serialized object
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=RenderEncoder().default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return renderdumps(obj).encode('utf-8')
+
+
 def renderdump(obj, *args, **kwargs):
     """json.dump using the RenderEncoder
 
@@ -399,9 +426,11 @@ def decodeBase64(src):
     Returns
     -------
     arr: length n numpy array of double-precision floats
+        C-contiguous, native byte order, and not sharing memory
+        with the decoded buffer
     """
     if src[0] == '@':
         b = base64.b64decode(src[1:])
     else:
         b = zlib.decompress(base64.b64decode(src))
-    return numpy.frombuffer(b).byteswap()
+    return numpy.frombuffer(b, dtype='>f8').astype(numpy.float64)
@@ -39,4 +39,5 @@ setup(name='render-python',
       setup_requires=['setuptools_scm'],
       install_requires=required,
       tests_require=test_required,
+      extras_require={'numba': ['numba'], 'orjson': ['orjson']},
       cmdclass={'test': PyTest},)
@@ -31,3 +31,9 @@ def test_resolvedtiles_from_dict(resolvedtiles_object,
     resolved_tiles = renderapi.resolvedtiles.ResolvedTiles(json=d)
     assert(len(tilespecs) == len(resolved_tiles.tilespecs))
     assert(len(transforms) == len(resolved_tiles.transforms))
+
+
+def test_resolvedtiles_to_json_bytes(resolvedtiles_object):
+    d = json.loads(resolvedtiles_object.to_json_bytes().decode('utf-8'))
+    assert d == json.loads(
+        renderapi.utils.renderdumps(resolvedtiles_object.to_dict()))
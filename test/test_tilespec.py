@@ -55,3 +55,11 @@ def test_bbox_shape():
         tilespecs = [renderapi.tilespec.TileSpec(json=d) for d in json.load(f)]
 
     assert(all([len(ts.bbox) == 4 for ts in tilespecs]))
+
+
+def test_tilespec_default_lists_not_shared():
+    ts1 = renderapi.tilespec.TileSpec(tileId='a')
+    ts2 = renderapi.tilespec.TileSpec(tileId='b')
+    ts1.tforms.append(renderapi.transform.AffineModel())
+    assert ts2.tforms == []
+    assert ts1.inputfilters is not ts2.inputfilters
@@ -1,9 +1,12 @@
+import copy
 import json
+import pickle
 import renderapi
 import numpy as np
 import scipy.linalg
 import rendersettings
 import importlib
+import types
 import pytest
 from scipy.spatial.distance import cdist
 
@@ -167,6 +170,75 @@ def test_invert_Affine():
     Iam = am.invert()
     assert(np.allclose(Iam.concatenate(am).M, np.eye(3)))
     assert(np.allclose(am.concatenate(Iam).M, np.eye(3)))
+    assert(np.allclose(am.Minv, np.linalg.inv(am.M)))
+
+    # assigning M must invalidate the cached inverse
+    newM = np.array([[2.0, 0.0, 1.0], [0.0, 4.0, -3.0], [0.0, 0.0, 1.0]])
+    am.M = newM
+    assert(np.allclose(am.Minv, np.linalg.inv(am.M)))
+    # in-place edits would leave cached values stale, so they must fail
+    with pytest.raises(ValueError):
+        am.M[0, 2] = 5.0
+    newM[0, 2] = 5.0
+    assert(am.M[0, 2] == 1.0)
+    am.M = np.array([[1.0, 2.0, 0.0], [2.0, 4.0, 0.0], [0.0, 0.0, 1.0]])
+    with pytest.raises(np.linalg.LinAlgError):
+        am.invert()
+
+
+@pytest.mark.parametrize('roundtrip', [
+    copy.deepcopy, lambda t: pickle.loads(pickle.dumps(t))])
+def test_affine_copy_keeps_caches_consistent(roundtrip):
+    am = renderapi.transform.AffineModel(
+        M00=0.9, M01=0.3, M10=-0.2, M11=0.85, B0=245.3, B1=-234.1)
+    am.Minv
+    am.dataString
+    am2 = roundtrip(am)
+    with pytest.raises(ValueError):
+        am2.M[0, 2] = 5.0
+    with pytest.raises(ValueError):
+        am2.Minv[0, 0] = 99.0
+    assert np.allclose(am2.Minv, np.linalg.inv(am2.M))
+    assert am2.dataString == am.dataString
+
+    am2.M = np.array([[2.0, 0.0, 1.0], [0.0, 4.0, -3.0], [0.0, 0.0, 1.0]])
+    assert np.allclose(am2.Minv, np.linalg.inv(am2.M))
+    assert renderapi.transform.AffineModel(
+        json=am2.to_dict()).B1 == -3.0
+    assert am.dataString != am2.dataString
+    assert np.allclose(am.Minv, np.linalg.inv(am.M))
+
+
+def test_affine_tform_dtype():
+    am = renderapi.transform.AffineModel(
+        M00=0.9, M01=0.1, M10=-0.2, M11=1.1, B0=3.0, B1=-4.0)
+    pts = np.random.rand(100, 2) * 1000
+    dst = am.tform(pts)
+    dst32 = am.tform(pts.astype(np.float32))
+    assert dst32.dtype == np.float32
+    assert np.allclose(dst32, dst, rtol=1e-5)
+    inv32 = am.inverse_tform(dst32)
+    assert inv32.dtype == np.float32
+    assert np.allclose(inv32, pts, rtol=1e-4)
+    assert am.tform(np.array([[1, 2]])).dtype == np.float64
+
+
+def test_affine_dataString_cache():
+    am = renderapi.transform.AffineModel(
+        B0=10.0, transformId='a', labels=['x'])
+    d = am.to_dict()
+    d['id'] = 'modified'
+    d['metaData']['labels'] = ['z']
+    assert am.to_dict()['id'] == 'a'
+    assert am.to_dict()['metaData']['labels'] == ['x']
+
+    # assigning M invalidates the memoized dataString
+    am.M = np.array([[1.0, 0.0, 5.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    assert am.to_dict()['dataString'] == am.dataString
+    assert renderapi.transform.AffineModel(json=am.to_dict()).B0 == 5.0
+    am.B1 = -2.0
+    am.load_M()
+    assert am.dataString.split()[-1] == '%.10f' % -2.0
 
 
 def test_polynomial_scale():
@@ -646,6 +718,8 @@ def test_fail_convert_points():
     points_in = np.array([[0, 0], [0, 1], [1, 0], [1, 1]], np.float)
     with pytest.raises(renderapi.errors.ConversionError):
         renderapi.transform.AffineModel.convert_to_point_vector(points_in.T)
+    with pytest.raises(renderapi.errors.ConversionError):
+        renderapi.transform.AffineModel().tform(points_in.T)
 
 
 def test_translation_transform_init():
@@ -828,6 +902,10 @@ def test_thinplatespline():
     t = renderapi.transform.ThinPlateSplineTransform(
             dataString=j['dataString'])
     assert (j['dataString'].split(' ')[-1] == t.dataString.split(' ')[-1])
+    assert t.srcPts.shape == (t.nLm, t.ndims)
+    assert t.dMtxDat.shape == (t.nLm, t.ndims)
+    assert t.srcPts.flags['C_CONTIGUOUS']
+    assert t.dMtxDat.flags['C_CONTIGUOUS']
     t.aMtx = np.zeros(4)
     t.bVec = np.zeros(2)
     t2 = renderapi.transform.ThinPlateSplineTransform(
@@ -872,6 +950,82 @@ def test_thinplatespline_apply():
     assert np.all(pt == npt)
 
 
+def test_thinplatespline_numba_matches_numpy(monkeypatch):
+    tps_module = renderapi.transform.leaf.thin_plate_spline
+    if tps_module._deformation_contribution_numba is None:
+        pytest.skip('numba not installed')
+    with open(rendersettings.TEST_THINPLATEROUGH_FILE, 'r') as f:
+        t = renderapi.transform.load_transform_json(json.load(f))
+    src = np.random.rand(500, 2) * t.srcPts.max(axis=0)
+    monkeypatch.setattr(tps_module, 'NUMBA_MIN_WORK', 0)
+    dst_numba = t.tform(src)
+    monkeypatch.setattr(tps_module, 'NUMBA_MIN_WORK', np.inf)
+    dst_numpy = t.tform(src)
+    assert np.allclose(dst_numba, dst_numpy)
+
+    # the numba dispatch must accept list input like the numpy path
+    monkeypatch.setattr(tps_module, 'NUMBA_MIN_WORK', 0)
+    assert np.allclose(
+        t.computeDeformationContribution(src.tolist()),
+        t.computeDeformationContribution(src))
+
+
+def test_thinplatespline_tform_batch():
+    with open(rendersettings.TEST_THINPLATEROUGH_FILE, 'r') as f:
+        rough = renderapi.transform.load_transform_json(json.load(f))
+    with open(rendersettings.TEST_THINPLATESPLINE_FILE, 'r') as f:
+        fine = renderapi.transform.ThinPlateSplineTransform(
+                dataString=json.load(f)['dataString'])
+    scaled = rough.scale_coordinates(1.1, ngrid=5)
+    noaffine = renderapi.transform.ThinPlateSplineTransform(
+            dataString=rough.dataString)
+    noaffine.aMtx = None
+    noaffine.bVec = None
+    empty = renderapi.transform.ThinPlateSplineTransform()
+
+    tforms = [rough, fine, scaled, noaffine, empty]
+    src = np.random.rand(200, 2) * rough.srcPts.max(axis=0)
+    dst = renderapi.transform.ThinPlateSplineTransform.tform_batch(
+            tforms, src)
+    assert dst.shape == (len(tforms),) + src.shape
+    for t, d in zip(tforms, dst):
+        assert np.allclose(t.tform(src), d)
+    # list input is accepted like tform
+    dst_list = renderapi.transform.ThinPlateSplineTransform.tform_batch(
+            tforms, src.tolist())
+    assert np.allclose(dst_list, dst)
+
+
+def test_thinplatespline_array_module_kernel():
+    # a stand-in array module exercises the non-numpy kernel without a GPU
+    xp = types.SimpleNamespace(
+        asarray=np.asarray, log=np.log, where=np.where, maximum=np.maximum)
+    with open(rendersettings.TEST_THINPLATEROUGH_FILE, 'r') as f:
+        t = renderapi.transform.load_transform_json(json.load(f))
+    # include the landmarks themselves, where r == 0
+    src = np.vstack((np.random.rand(200, 2) * t.srcPts.max(axis=0),
+                     t.srcPts))
+    assert np.allclose(t.tform(src, xp=xp), t.tform(src))
+    # device copies are reused until a host array is replaced
+    device = t._device_arrays(xp)
+    assert all(a is b for a, b in zip(t._device_arrays(xp), device))
+    t.bVec = t.bVec + 1.0
+    assert t._device_arrays(xp)[3] is not device[3]
+    assert np.allclose(t.tform(src, xp=xp), t.tform(src))
+
+
+def test_tform_cupy():
+    cupy = pytest.importorskip('cupy')
+    with open(rendersettings.TEST_THINPLATEROUGH_FILE, 'r') as f:
+        tps = renderapi.transform.load_transform_json(json.load(f))
+    am = renderapi.transform.AffineModel(M00=1.1, M01=0.2, B0=4.0, B1=-2.0)
+    src = np.random.rand(500, 2) * tps.srcPts.max(axis=0)
+    for tf in [tps, am]:
+        dst = tf.tform(src, xp=cupy)
+        assert isinstance(dst, cupy.ndarray)
+        assert np.allclose(cupy.asnumpy(dst), tf.tform(src))
+
+
 def estimate_test(jpath, computeAffine=True):
     # test that the estimate method can produce same results
     with open(jpath, 'r') as f:
@@ -880,7 +1034,7 @@ def estimate_test(jpath, computeAffine=True):
     t = renderapi.transform.ThinPlateSplineTransform(
             dataString=j['dataString'])
     # exact points
-    src1 = np.transpose(t.srcPts)
+    src1 = t.srcPts
     # some in-between points
     x = np.linspace(
             src1[:, 0].min(),
@@ -965,6 +1119,8 @@ def test_encode64():
     s = renderapi.utils.encodeBase64(x)
     y = renderapi.utils.decodeBase64(s)
     assert(np.all(x == y))
+    assert(y.dtype == np.float64)
+    assert(y.flags['C_CONTIGUOUS'] and y.flags['WRITEABLE'])
 
 
 def test_adaptive_estimate():
@@ -977,12 +1133,12 @@ def test_adaptive_estimate():
     tol = 1.0
     ntf = tf.adaptive_mesh_estimate(tol=1.0)
 
-    src = ntf.srcPts.transpose()
+    src = ntf.srcPts
     dsta = tf.tform(src)
     dstb = ntf.tform(src)
     assert(np.linalg.norm(dsta - dstb, axis=1).max() <= tol)
 
-    src = tf.srcPts.transpose()
+    src = tf.srcPts
     dsta = tf.tform(src)
     dstb = ntf.tform(src)
     nover = np.argwhere(np.linalg.norm(dsta - dstb, axis=1) >= tol).size
@@ -992,13 +1148,13 @@ def test_adaptive_estimate():
         tf.adaptive_mesh_estimate(max_iter=1)
 
     # invoke the recursion directly, without passing self
-    mn = tf.srcPts.min(axis=1)
-    mx = tf.srcPts.max(axis=1)
+    mn = tf.srcPts.min(axis=0)
+    mx = tf.srcPts.max(axis=0)
     xt, yt = np.meshgrid(
             np.linspace(mn[0], mx[0], 5),
             np.linspace(mn[1], mx[1], 5))
     new_src = np.vstack((xt.flatten(), yt.flatten())).transpose()
-    old_src = tf.srcPts.transpose()
+    old_src = tf.srcPts
     old_dst = tf.tform(old_src)
     ntf = tf.mesh_refine(
         new_src,
@@ -1077,8 +1233,8 @@ def test_scale_thinplate(factor, computeAffine, preserve_srcPts, ngrid):
 
     if preserve_srcPts:
         dist = cdist(
-                tform.srcPts.transpose() * factor,
-                scaled_tform.srcPts.transpose(),
+                tform.srcPts * factor,
+                scaled_tform.srcPts,
                 metric='euclidean')
         # check that the original srcPts have a close neighbor still
         # in the scaled srcPts
@@ -51,6 +51,20 @@ def test_renderdumps_simple():
     assert(s == '5')
 
 
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_renderdumps_bytes(use_orjson, monkeypatch):
+    if not use_orjson:
+        monkeypatch.setattr(renderapi.utils, 'orjson', None)
+    elif renderapi.utils.orjson is None:
+        pytest.skip('orjson not installed')
+    tform = renderapi.transform.AffineModel(B0=3.0)
+    d = {'a': 1, 'b': [tform], 'c': np.int64(4)}
+    b = renderapi.utils.renderdumps_bytes(d)
+    assert isinstance(b, bytes)
+    expected = json.loads(renderapi.utils.renderdumps(d))
+    assert json.loads(b.decode('utf-8')) == expected
+
+
 def test_renderdumps_fails():
     with pytest.raises(AttributeError):
         renderapi.utils.renderdumps(np.zeros(3))